@@ -1,9 +1,12 @@
 """Worker using SDK Core."""
 
+import asyncio
+import functools
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, List
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, Iterator, List
 
 import google.protobuf.internal.containers
+import google.protobuf.message
 
 import temporalio.api.common.v1
 import temporalio.bridge.client
@@ -11,6 +14,7 @@ import temporalio.bridge.proto
 import temporalio.bridge.proto.activity_task
 import temporalio.bridge.proto.common
 import temporalio.bridge.proto.workflow_activation
+import temporalio.bridge.proto.workflow_commands
 import temporalio.bridge.proto.workflow_completion
 import temporalio.bridge.temporal_sdk_bridge
 import temporalio.common
@@ -157,6 +161,17 @@ def to_bridge_payloads(
     return [to_bridge_payload(p) for p in payloads]
 
 
+def to_bridge_payloads_iter(
+    payloads: Iterable[temporalio.api.common.v1.Payload],
+) -> Iterator[temporalio.bridge.proto.common.Payload]:
+    """Lazily convert from API payloads to bridge payloads.
+
+    Prefer this over :py:func:`to_bridge_payloads` when the result is only
+    iterated once, e.g. when extending a repeated field.
+    """
+    return map(to_bridge_payload, payloads)
+
+
 def to_bridge_payload(
     payload: temporalio.api.common.v1.Payload,
 ) -> temporalio.bridge.proto.common.Payload:
@@ -180,19 +195,28 @@ else:
 
 
 async def _apply_to_bridge_payloads(
-    payloads: BridgePayloadContainer,
+    parent: google.protobuf.message.Message,
+    field: str,
     cb: Callable[
         [Iterable[temporalio.api.common.v1.Payload]],
         Awaitable[List[temporalio.api.common.v1.Payload]],
     ],
 ) -> None:
-    """Apply API payload callback to bridge payloads."""
+    """Apply API payload callback to the bridge payloads in the parent field."""
+    payloads: BridgePayloadContainer = getattr(parent, field)
     if len(payloads) == 0:
         return
-    new_payloads = to_bridge_payloads(await cb(from_bridge_payloads(payloads)))
-    del payloads[:]
-    # TODO(cretz): Copy too expensive?
-    payloads.extend(new_payloads)
+    new_payloads = await cb(from_bridge_payloads(payloads))
+    # Clearing the field on the parent is a single call instead of deleting
+    # each element from the container
+    parent.ClearField(field)
+    payloads = getattr(parent, field)
+    # Write directly into the container instead of building intermediate
+    # bridge payloads that extend would only copy again
+    for new_payload in new_payloads:
+        payload = payloads.add()
+        payload.metadata.update(new_payload.metadata)
+        payload.data = new_payload.data
 
 
 async def _apply_to_bridge_payload(
@@ -204,17 +228,23 @@ async def _apply_to_bridge_payload(
 ) -> None:
     """Apply API payload callback to bridge payload."""
     new_payload = (await cb([from_bridge_payload(payload)]))[0]
+    # Codecs nearly always change the data, so only pay for comparing the
+    # metadata maps when it is unchanged
+    if payload.data != new_payload.data:
+        payload.data = new_payload.data
+    elif payload.metadata == new_payload.metadata:
+        return
     payload.metadata.clear()
     payload.metadata.update(new_payload.metadata)
-    payload.data = new_payload.data
 
 
 async def _decode_bridge_payloads(
-    payloads: BridgePayloadContainer,
+    parent: google.protobuf.message.Message,
+    field: str,
     codec: temporalio.converter.PayloadCodec,
 ) -> None:
-    """Decode bridge payloads with the given codec."""
-    return await _apply_to_bridge_payloads(payloads, codec.decode)
+    """Decode bridge payloads in the parent field with the given codec."""
+    return await _apply_to_bridge_payloads(parent, field, codec.decode)
 
 
 async def _decode_bridge_payload(
@@ -226,11 +256,12 @@ async def _decode_bridge_payload(
 
 
 async def _encode_bridge_payloads(
-    payloads: BridgePayloadContainer,
+    parent: google.protobuf.message.Message,
+    field: str,
     codec: temporalio.converter.PayloadCodec,
 ) -> None:
-    """Encode bridge payloads with the given codec."""
-    return await _apply_to_bridge_payloads(payloads, codec.encode)
+    """Encode bridge payloads in the parent field with the given codec."""
+    return await _apply_to_bridge_payloads(parent, field, codec.encode)
 
 
 async def _encode_bridge_payload(
@@ -241,128 +272,280 @@ async def _encode_bridge_payload(
     return await _apply_to_bridge_payload(payload, codec.encode)
 
 
+async def _decode_cancel_workflow(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _decode_bridge_payloads(job.cancel_workflow, "details", codec)
+
+
+async def _decode_query_workflow(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _decode_bridge_payloads(job.query_workflow, "arguments", codec)
+
+
+async def _decode_resolve_activity(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    result = job.resolve_activity.result
+    status = result.WhichOneof("status")
+    if status == "cancelled":
+        await temporalio.exceptions.decode_failure(result.cancelled.failure, codec)
+    elif status == "completed":
+        if result.completed.HasField("result"):
+            await _decode_bridge_payload(result.completed.result, codec)
+    elif status == "failed":
+        await temporalio.exceptions.decode_failure(result.failed.failure, codec)
+
+
+async def _decode_resolve_child_workflow_execution(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    result = job.resolve_child_workflow_execution.result
+    status = result.WhichOneof("status")
+    if status == "cancelled":
+        await temporalio.exceptions.decode_failure(result.cancelled.failure, codec)
+    elif status == "completed":
+        if result.completed.HasField("result"):
+            await _decode_bridge_payload(result.completed.result, codec)
+    elif status == "failed":
+        await temporalio.exceptions.decode_failure(result.failed.failure, codec)
+
+
+async def _decode_resolve_child_workflow_execution_start(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    if job.resolve_child_workflow_execution_start.HasField("cancelled"):
+        await temporalio.exceptions.decode_failure(
+            job.resolve_child_workflow_execution_start.cancelled.failure, codec
+        )
+
+
+async def _decode_resolve_request_cancel_external_workflow(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    if job.resolve_request_cancel_external_workflow.HasField("failure"):
+        await temporalio.exceptions.decode_failure(
+            job.resolve_request_cancel_external_workflow.failure, codec
+        )
+
+
+async def _decode_resolve_signal_external_workflow(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    if job.resolve_signal_external_workflow.HasField("failure"):
+        await temporalio.exceptions.decode_failure(
+            job.resolve_signal_external_workflow.failure, codec
+        )
+
+
+async def _decode_signal_workflow(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _decode_bridge_payloads(job.signal_workflow, "input", codec)
+
+
+async def _decode_start_workflow(
+    job: temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _decode_bridge_payloads(job.start_workflow, "arguments", codec)
+    if job.start_workflow.HasField("continued_failure"):
+        await temporalio.exceptions.decode_failure(
+            job.start_workflow.continued_failure, codec
+        )
+    for val in job.start_workflow.memo.fields.values():
+        # This uses API payload not bridge payload, so being the same message
+        # type the whole payload can be copied in one call
+        new_payload = (await codec.decode([val]))[0]
+        # Data is compared first as codecs nearly always change it
+        if val.data != new_payload.data or val.metadata != new_payload.metadata:
+            val.CopyFrom(new_payload)
+
+
+# Job variants not present here have no payloads to decode
+_JOB_DECODERS: Dict[
+    str,
+    Callable[
+        [
+            temporalio.bridge.proto.workflow_activation.WorkflowActivationJob,
+            temporalio.converter.PayloadCodec,
+        ],
+        Awaitable[None],
+    ],
+] = {
+    "cancel_workflow": _decode_cancel_workflow,
+    "query_workflow": _decode_query_workflow,
+    "resolve_activity": _decode_resolve_activity,
+    "resolve_child_workflow_execution": _decode_resolve_child_workflow_execution,
+    "resolve_child_workflow_execution_start": _decode_resolve_child_workflow_execution_start,
+    "resolve_request_cancel_external_workflow": _decode_resolve_request_cancel_external_workflow,
+    "resolve_signal_external_workflow": _decode_resolve_signal_external_workflow,
+    "signal_workflow": _decode_signal_workflow,
+    "start_workflow": _decode_start_workflow,
+}
+
+
 async def decode_activation(
     act: temporalio.bridge.proto.workflow_activation.WorkflowActivation,
     codec: temporalio.converter.PayloadCodec,
 ) -> None:
-    """Decode the given activation with the codec."""
+    """Decode the given activation with the codec.
+
+    Jobs are decoded concurrently if the codec is
+    :py:attr:`temporalio.converter.PayloadCodec.concurrency_safe`.
+    """
+    calls: List[Callable[[], Awaitable[None]]] = []
     for job in act.jobs:
-        if job.HasField("cancel_workflow"):
-            await _decode_bridge_payloads(job.cancel_workflow.details, codec)
-        elif job.HasField("query_workflow"):
-            await _decode_bridge_payloads(job.query_workflow.arguments, codec)
-        elif job.HasField("resolve_activity"):
-            if job.resolve_activity.result.HasField("cancelled"):
-                await temporalio.exceptions.decode_failure(
-                    job.resolve_activity.result.cancelled.failure, codec
-                )
-            elif job.resolve_activity.result.HasField("completed"):
-                if job.resolve_activity.result.completed.HasField("result"):
-                    await _decode_bridge_payload(
-                        job.resolve_activity.result.completed.result, codec
-                    )
-            elif job.resolve_activity.result.HasField("failed"):
-                await temporalio.exceptions.decode_failure(
-                    job.resolve_activity.result.failed.failure, codec
-                )
-        elif job.HasField("resolve_child_workflow_execution"):
-            if job.resolve_child_workflow_execution.result.HasField("cancelled"):
-                await temporalio.exceptions.decode_failure(
-                    job.resolve_child_workflow_execution.result.cancelled.failure, codec
-                )
-            elif job.resolve_child_workflow_execution.result.HasField(
-                "completed"
-            ) and job.resolve_child_workflow_execution.result.completed.HasField(
-                "result"
-            ):
-                await _decode_bridge_payload(
-                    job.resolve_child_workflow_execution.result.completed.result, codec
-                )
-            elif job.resolve_child_workflow_execution.result.HasField("failed"):
-                await temporalio.exceptions.decode_failure(
-                    job.resolve_child_workflow_execution.result.failed.failure, codec
-                )
-        elif job.HasField("resolve_child_workflow_execution_start"):
-            if job.resolve_child_workflow_execution_start.HasField("cancelled"):
-                await temporalio.exceptions.decode_failure(
-                    job.resolve_child_workflow_execution_start.cancelled.failure, codec
-                )
-        elif job.HasField("resolve_request_cancel_external_workflow"):
-            if job.resolve_request_cancel_external_workflow.HasField("failure"):
-                await temporalio.exceptions.decode_failure(
-                    job.resolve_request_cancel_external_workflow.failure, codec
-                )
-        elif job.HasField("resolve_signal_external_workflow"):
-            if job.resolve_signal_external_workflow.HasField("failure"):
-                await temporalio.exceptions.decode_failure(
-                    job.resolve_signal_external_workflow.failure, codec
-                )
-        elif job.HasField("signal_workflow"):
-            await _decode_bridge_payloads(job.signal_workflow.input, codec)
-        elif job.HasField("start_workflow"):
-            await _decode_bridge_payloads(job.start_workflow.arguments, codec)
-            if job.start_workflow.HasField("continued_failure"):
-                await temporalio.exceptions.decode_failure(
-                    job.start_workflow.continued_failure, codec
-                )
-            for val in job.start_workflow.memo.fields.values():
-                # This uses API payload not bridge payload
-                new_payload = (await codec.decode([val]))[0]
-                val.metadata.clear()
-                val.metadata.update(new_payload.metadata)
-                val.data = new_payload.data
+        decoder = _JOB_DECODERS.get(job.WhichOneof("variant") or "")
+        if decoder:
+            calls.append(functools.partial(decoder, job, codec))
+    await _call_all(calls, codec.concurrency_safe)
+
+
+async def _encode_complete_workflow_execution(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    if command.complete_workflow_execution.HasField("result"):
+        await _encode_bridge_payload(command.complete_workflow_execution.result, codec)
+
+
+async def _encode_continue_as_new_workflow_execution(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _encode_bridge_payloads(
+        command.continue_as_new_workflow_execution, "arguments", codec
+    )
+    for val in command.continue_as_new_workflow_execution.memo.values():
+        await _encode_bridge_payload(val, codec)
+
+
+async def _encode_fail_workflow_execution(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await temporalio.exceptions.encode_failure(
+        command.fail_workflow_execution.failure, codec
+    )
+
+
+async def _encode_respond_to_query(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    variant = command.respond_to_query.WhichOneof("variant")
+    if variant == "failed":
+        await temporalio.exceptions.encode_failure(
+            command.respond_to_query.failed, codec
+        )
+    elif variant == "succeeded":
+        if command.respond_to_query.succeeded.HasField("response"):
+            await _encode_bridge_payload(
+                command.respond_to_query.succeeded.response, codec
+            )
+
+
+async def _encode_schedule_activity(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _encode_bridge_payloads(command.schedule_activity, "arguments", codec)
+
+
+async def _encode_schedule_local_activity(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _encode_bridge_payloads(command.schedule_local_activity, "arguments", codec)
+
+
+async def _encode_signal_external_workflow_execution(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _encode_bridge_payloads(
+        command.signal_external_workflow_execution, "args", codec
+    )
+
+
+async def _encode_start_child_workflow_execution(
+    command: temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+    codec: temporalio.converter.PayloadCodec,
+) -> None:
+    await _encode_bridge_payloads(
+        command.start_child_workflow_execution, "input", codec
+    )
+    for val in command.start_child_workflow_execution.memo.values():
+        await _encode_bridge_payload(val, codec)
+
+
+# Command variants not present here have no payloads to encode
+_COMMAND_ENCODERS: Dict[
+    str,
+    Callable[
+        [
+            temporalio.bridge.proto.workflow_commands.WorkflowCommand,
+            temporalio.converter.PayloadCodec,
+        ],
+        Awaitable[None],
+    ],
+] = {
+    "complete_workflow_execution": _encode_complete_workflow_execution,
+    "continue_as_new_workflow_execution": _encode_continue_as_new_workflow_execution,
+    "fail_workflow_execution": _encode_fail_workflow_execution,
+    "respond_to_query": _encode_respond_to_query,
+    "schedule_activity": _encode_schedule_activity,
+    "schedule_local_activity": _encode_schedule_local_activity,
+    "signal_external_workflow_execution": _encode_signal_external_workflow_execution,
+    "start_child_workflow_execution": _encode_start_child_workflow_execution,
+}
 
 
 async def encode_completion(
     comp: temporalio.bridge.proto.workflow_completion.WorkflowActivationCompletion,
     codec: temporalio.converter.PayloadCodec,
 ) -> None:
-    """Recursively encode the given completion with the codec."""
-    if comp.HasField("failed"):
+    """Recursively encode the given completion with the codec.
+
+    Commands are encoded concurrently if the codec is
+    :py:attr:`temporalio.converter.PayloadCodec.concurrency_safe`.
+    """
+    status = comp.WhichOneof("status")
+    if status == "failed":
         await temporalio.exceptions.encode_failure(comp.failed.failure, codec)
-    elif comp.HasField("successful"):
+    elif status == "successful":
+        calls: List[Callable[[], Awaitable[None]]] = []
         for command in comp.successful.commands:
-            if command.HasField("complete_workflow_execution"):
-                if command.complete_workflow_execution.HasField("result"):
-                    await _encode_bridge_payload(
-                        command.complete_workflow_execution.result, codec
-                    )
-            elif command.HasField("continue_as_new_workflow_execution"):
-                await _encode_bridge_payloads(
-                    command.continue_as_new_workflow_execution.arguments, codec
-                )
-                for val in command.continue_as_new_workflow_execution.memo.values():
-                    await _encode_bridge_payload(val, codec)
-            elif command.HasField("fail_workflow_execution"):
-                await temporalio.exceptions.encode_failure(
-                    command.fail_workflow_execution.failure, codec
-                )
-            elif command.HasField("respond_to_query"):
-                if command.respond_to_query.HasField("failed"):
-                    await temporalio.exceptions.encode_failure(
-                        command.respond_to_query.failed, codec
-                    )
-                elif command.respond_to_query.HasField(
-                    "succeeded"
-                ) and command.respond_to_query.succeeded.HasField("response"):
-                    await _encode_bridge_payload(
-                        command.respond_to_query.succeeded.response, codec
-                    )
-            elif command.HasField("schedule_activity"):
-                await _encode_bridge_payloads(
-                    command.schedule_activity.arguments, codec
-                )
-            elif command.HasField("schedule_local_activity"):
-                await _encode_bridge_payloads(
-                    command.schedule_local_activity.arguments, codec
-                )
-            elif command.HasField("signal_external_workflow_execution"):
-                await _encode_bridge_payloads(
-                    command.signal_external_workflow_execution.args, codec
-                )
-            elif command.HasField("start_child_workflow_execution"):
-                await _encode_bridge_payloads(
-                    command.start_child_workflow_execution.input, codec
-                )
-                for val in command.start_child_workflow_execution.memo.values():
-                    await _encode_bridge_payload(val, codec)
+            encoder = _COMMAND_ENCODERS.get(command.WhichOneof("variant") or "")
+            if encoder:
+                calls.append(functools.partial(encoder, command, codec))
+        await _call_all(calls, codec.concurrency_safe)
+
+
+async def _call_all(
+    calls: List[Callable[[], Awaitable[None]]], concurrent: bool
+) -> None:
+    # Await one at a time unless the codec opts into concurrency, and skip the
+    # task overhead of gather for the common single-item case
+    if not concurrent or len(calls) == 1:
+        for call in calls:
+            await call()
+    elif calls:
+        # Let every call finish before raising so none are still mutating the
+        # proto after a failure is reported
+        results = await asyncio.gather(
+            *(call() for call in calls), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
@@ -447,8 +447,27 @@ class PayloadCodec(ABC):
     """Codec for encoding/decoding to/from bytes.
 
     Commonly used for compression or encryption.
+
+    Encoding and decoding are awaited on the worker's event loop. Codecs that
+    perform CPU-heavy work should offload it themselves (e.g. via
+    :py:meth:`asyncio.loop.run_in_executor`) so polling is not blocked.
+
+    Workers only invoke the codec concurrently for separate sets of payloads
+    (e.g. different jobs of the same workflow activation) if
+    :py:attr:`concurrency_safe` is overridden to return ``True``.
     """
 
+    @property
+    def concurrency_safe(self) -> bool:
+        """Whether the codec may be awaited concurrently.
+
+        Defaults to ``False`` which means workers await each call to completion
+        before starting the next. Override to return ``True`` for codecs that
+        are safe to await concurrently, e.g. ones offloading to a remote
+        service, so separate sets of payloads are processed in parallel.
+        """
+        return False
+
     @abstractmethod
     async def encode(
         self, payloads: Iterable[temporalio.api.common.v1.Payload]
@@ -497,22 +497,19 @@ async def _apply_to_failure_payloads(
     failure: temporalio.api.failure.v1.Failure,
     cb: Callable[[temporalio.api.common.v1.Payloads], Awaitable[None]],
 ) -> None:
-    if failure.HasField(
-        "application_failure_info"
-    ) and failure.application_failure_info.HasField("details"):
-        await cb(failure.application_failure_info.details)
-    elif failure.HasField(
-        "timeout_failure_info"
-    ) and failure.timeout_failure_info.HasField("last_heartbeat_details"):
-        await cb(failure.timeout_failure_info.last_heartbeat_details)
-    elif failure.HasField(
-        "canceled_failure_info"
-    ) and failure.canceled_failure_info.HasField("details"):
-        await cb(failure.canceled_failure_info.details)
-    elif failure.HasField(
-        "reset_workflow_failure_info"
-    ) and failure.reset_workflow_failure_info.HasField("last_heartbeat_details"):
-        await cb(failure.reset_workflow_failure_info.last_heartbeat_details)
+    failure_info = failure.WhichOneof("failure_info")
+    if failure_info == "application_failure_info":
+        if failure.application_failure_info.HasField("details"):
+            await cb(failure.application_failure_info.details)
+    elif failure_info == "timeout_failure_info":
+        if failure.timeout_failure_info.HasField("last_heartbeat_details"):
+            await cb(failure.timeout_failure_info.last_heartbeat_details)
+    elif failure_info == "canceled_failure_info":
+        if failure.canceled_failure_info.HasField("details"):
+            await cb(failure.canceled_failure_info.details)
+    elif failure_info == "reset_workflow_failure_info":
+        if failure.reset_workflow_failure_info.HasField("last_heartbeat_details"):
+            await cb(failure.reset_workflow_failure_info.last_heartbeat_details)
     if failure.HasField("cause"):
         await _apply_to_failure_payloads(failure.cause, cb)
 
@@ -222,7 +222,7 @@ class _ActivityWorker:
                 converted_details = await self._data_converter.encode(details)
                 # Convert to core payloads
                 heartbeat.details.extend(
-                    temporalio.bridge.worker.to_bridge_payloads(converted_details)
+                    temporalio.bridge.worker.to_bridge_payloads_iter(converted_details)
                 )
             logger.debug("Recording heartbeat with details %s", details)
             self._bridge_worker().record_activity_heartbeat(heartbeat)
@@ -1424,7 +1424,7 @@ class _ActivityHandle(temporalio.workflow.ActivityHandle[Any]):
         # v.headers = input.he
         if self._input.args:
             v.arguments.extend(
-                temporalio.bridge.worker.to_bridge_payloads(
+                temporalio.bridge.worker.to_bridge_payloads_iter(
                     self._instance._payload_converter.to_payloads(self._input.args)
                 )
             )
@@ -1520,7 +1520,7 @@ class _ChildWorkflowHandle(temporalio.workflow.ChildWorkflowHandle[Any, Any]):
         args = temporalio.common._arg_or_args(arg, args)
         if args:
             v.args.extend(
-                temporalio.bridge.worker.to_bridge_payloads(
+                temporalio.bridge.worker.to_bridge_payloads_iter(
                     self._instance._payload_converter.to_payloads(args)
                 )
             )
@@ -1558,7 +1558,7 @@ class _ChildWorkflowHandle(temporalio.workflow.ChildWorkflowHandle[Any, Any]):
         v.task_queue = self._input.task_queue or self._instance._info.task_queue
         if self._input.args:
             v.input.extend(
-                temporalio.bridge.worker.to_bridge_payloads(
+                temporalio.bridge.worker.to_bridge_payloads_iter(
                     self._instance._payload_converter.to_payloads(self._input.args)
                 )
             )
@@ -1658,7 +1658,7 @@ class _ExternalWorkflowHandle(temporalio.workflow.ExternalWorkflowHandle[Any]):
         args = temporalio.common._arg_or_args(arg, args)
         if args:
             v.args.extend(
-                temporalio.bridge.worker.to_bridge_payloads(
+                temporalio.bridge.worker.to_bridge_payloads_iter(
                     self._instance._payload_converter.to_payloads(args)
                 )
             )
@@ -1694,7 +1694,7 @@ class _ContinueAsNewError(temporalio.workflow.ContinueAsNewError):
             v.task_queue = self._input.task_queue
         if self._input.args:
             v.arguments.extend(
-                temporalio.bridge.worker.to_bridge_payloads(
+                temporalio.bridge.worker.to_bridge_payloads_iter(
                     self._instance._payload_converter.to_payloads(self._input.args)
                 )
             )
@@ -0,0 +1,468 @@
+import asyncio
+from typing import Any, Iterable, List
+
+import google.protobuf.message
+import pytest
+
+import temporalio.api.common.v1
+import temporalio.api.failure.v1
+import temporalio.bridge.proto.activity_result
+import temporalio.bridge.proto.child_workflow
+import temporalio.bridge.proto.common
+import temporalio.bridge.proto.workflow_activation
+import temporalio.bridge.proto.workflow_commands
+import temporalio.bridge.proto.workflow_completion
+import temporalio.bridge.worker
+from temporalio.converter import PayloadCodec
+
+
+# Marks every payload it sees with the operation performed
+class MarkingCodec(PayloadCodec):
+    async def encode(
+        self, payloads: Iterable[temporalio.api.common.v1.Payload]
+    ) -> List[temporalio.api.common.v1.Payload]:
+        return [
+            temporalio.api.common.v1.Payload(
+                metadata={"marked": b"encode"}, data=p.data
+            )
+            for p in payloads
+        ]
+
+    async def decode(
+        self, payloads: Iterable[temporalio.api.common.v1.Payload]
+    ) -> List[temporalio.api.common.v1.Payload]:
+        return [
+            temporalio.api.common.v1.Payload(
+                metadata={"marked": b"decode"}, data=p.data
+            )
+            for p in payloads
+        ]
+
+
+def _payload() -> temporalio.bridge.proto.common.Payload:
+    return temporalio.bridge.proto.common.Payload(data=b"some data")
+
+
+def _api_payload() -> temporalio.api.common.v1.Payload:
+    return temporalio.api.common.v1.Payload(data=b"some data")
+
+
+def _failure() -> temporalio.api.failure.v1.Failure:
+    return temporalio.api.failure.v1.Failure(
+        message="some failure",
+        application_failure_info=temporalio.api.failure.v1.ApplicationFailureInfo(
+            details=temporalio.api.common.v1.Payloads(payloads=[_api_payload()])
+        ),
+    )
+
+
+_PAYLOAD_TYPES = {
+    temporalio.bridge.proto.common.Payload.DESCRIPTOR.full_name,
+    temporalio.api.common.v1.Payload.DESCRIPTOR.full_name,
+}
+
+
+# Collects all bridge and API payloads anywhere within the message
+def _all_payloads(msg: google.protobuf.message.Message) -> List[Any]:
+    if msg.DESCRIPTOR.full_name in _PAYLOAD_TYPES:
+        return [msg]
+    payloads = []
+    for field, value in msg.ListFields():
+        if not field.message_type:
+            continue
+        if field.message_type.GetOptions().map_entry:
+            if field.message_type.fields_by_name["value"].message_type:
+                for v in value.values():
+                    payloads += _all_payloads(v)
+        elif field.label == field.LABEL_REPEATED:
+            for v in value:
+                payloads += _all_payloads(v)
+        else:
+            payloads += _all_payloads(value)
+    return payloads
+
+
+def _assert_all_marked(msg: google.protobuf.message.Message, mark: bytes) -> int:
+    payloads = _all_payloads(msg)
+    for payload in payloads:
+        assert payload.metadata["marked"] == mark
+        assert payload.data == b"some data"
+    return len(payloads)
+
+
+async def test_encode_completion_all_commands():
+    commands = temporalio.bridge.proto.workflow_commands
+    comp = temporalio.bridge.proto.workflow_completion.WorkflowActivationCompletion(
+        run_id="some run"
+    )
+    comp.successful.commands.extend(
+        [
+            commands.WorkflowCommand(
+                complete_workflow_execution=commands.CompleteWorkflowExecution(
+                    result=_payload()
+                )
+            ),
+            commands.WorkflowCommand(
+                continue_as_new_workflow_execution=commands.ContinueAsNewWorkflowExecution(
+                    arguments=[_payload(), _payload()],
+                    memo={"foo": _payload(), "bar": _payload()},
+                )
+            ),
+            commands.WorkflowCommand(
+                fail_workflow_execution=commands.FailWorkflowExecution(
+                    failure=_failure()
+                )
+            ),
+            commands.WorkflowCommand(
+                respond_to_query=commands.QueryResult(
+                    succeeded=commands.QuerySuccess(response=_payload())
+                )
+            ),
+            commands.WorkflowCommand(
+                schedule_activity=commands.ScheduleActivity(
+                    arguments=[_payload(), _payload()]
+                )
+            ),
+            commands.WorkflowCommand(
+                schedule_local_activity=commands.ScheduleLocalActivity(
+                    arguments=[_payload(), _payload()]
+                )
+            ),
+            commands.WorkflowCommand(
+                signal_external_workflow_execution=commands.SignalExternalWorkflowExecution(
+                    args=[_payload(), _payload()]
+                )
+            ),
+            commands.WorkflowCommand(
+                start_child_workflow_execution=commands.StartChildWorkflowExecution(
+                    input=[_payload(), _payload()],
+                    memo={"foo": _payload(), "bar": _payload()},
+                )
+            ),
+        ]
+    )
+    # Confirm every encoded variant is covered here
+    assert {
+        c.WhichOneof("variant") for c in comp.successful.commands
+    } == temporalio.bridge.worker._COMMAND_ENCODERS.keys()
+
+    await temporalio.bridge.worker.encode_completion(comp, MarkingCodec())
+    assert _assert_all_marked(comp, b"encode") == 17
+
+    # Failed completion
+    comp = temporalio.bridge.proto.workflow_completion.WorkflowActivationCompletion(
+        run_id="some run"
+    )
+    comp.failed.failure.CopyFrom(_failure())
+    await temporalio.bridge.worker.encode_completion(comp, MarkingCodec())
+    assert _assert_all_marked(comp, b"encode") == 1
+
+
+async def test_decode_activation_all_jobs():
+    activation = temporalio.bridge.proto.workflow_activation
+    activity_result = temporalio.bridge.proto.activity_result
+    child_workflow = temporalio.bridge.proto.child_workflow
+    act = activation.WorkflowActivation(
+        run_id="some run",
+        jobs=[
+            activation.WorkflowActivationJob(
+                cancel_workflow=activation.CancelWorkflow(
+                    details=[_payload(), _payload()]
+                )
+            ),
+            activation.WorkflowActivationJob(
+                query_workflow=activation.QueryWorkflow(
+                    arguments=[_payload(), _payload()]
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_activity=activation.ResolveActivity(
+                    result=activity_result.ActivityResolution(
+                        completed=activity_result.Success(result=_payload())
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_child_workflow_execution=activation.ResolveChildWorkflowExecution(
+                    result=child_workflow.ChildWorkflowResult(
+                        completed=child_workflow.Success(result=_payload())
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_child_workflow_execution_start=activation.ResolveChildWorkflowExecutionStart(
+                    cancelled=activation.ResolveChildWorkflowExecutionStartCancelled(
+                        failure=_failure()
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_request_cancel_external_workflow=activation.ResolveRequestCancelExternalWorkflow(
+                    failure=_failure()
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_signal_external_workflow=activation.ResolveSignalExternalWorkflow(
+                    failure=_failure()
+                )
+            ),
+            activation.WorkflowActivationJob(
+                signal_workflow=activation.SignalWorkflow(
+                    input=[_payload(), _payload()]
+                )
+            ),
+            activation.WorkflowActivationJob(
+                start_workflow=activation.StartWorkflow(
+                    arguments=[_payload(), _payload()],
+                    continued_failure=_failure(),
+                    memo=temporalio.api.common.v1.Memo(
+                        fields={"foo": _api_payload(), "bar": _api_payload()}
+                    ),
+                )
+            ),
+        ],
+    )
+    # Confirm every decoded variant is covered here
+    assert {
+        j.WhichOneof("variant") for j in act.jobs
+    } == temporalio.bridge.worker._JOB_DECODERS.keys()
+
+    await temporalio.bridge.worker.decode_activation(act, MarkingCodec())
+    assert _assert_all_marked(act, b"decode") == 16
+
+    # Failure and cancel results
+    act = activation.WorkflowActivation(
+        run_id="some run",
+        jobs=[
+            activation.WorkflowActivationJob(
+                resolve_activity=activation.ResolveActivity(
+                    result=activity_result.ActivityResolution(
+                        failed=activity_result.Failure(failure=_failure())
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_activity=activation.ResolveActivity(
+                    result=activity_result.ActivityResolution(
+                        cancelled=activity_result.Cancellation(failure=_failure())
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_child_workflow_execution=activation.ResolveChildWorkflowExecution(
+                    result=child_workflow.ChildWorkflowResult(
+                        failed=child_workflow.Failure(failure=_failure())
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_child_workflow_execution=activation.ResolveChildWorkflowExecution(
+                    result=child_workflow.ChildWorkflowResult(
+                        cancelled=child_workflow.Cancellation(failure=_failure())
+                    )
+                )
+            ),
+        ],
+    )
+    await temporalio.bridge.worker.decode_activation(act, MarkingCodec())
+    assert _assert_all_marked(act, b"decode") == 4
+
+
+# Records how many calls overlap and fails on payloads whose data starts with
+# "fail"
+class TrackingCodec(PayloadCodec):
+    def __init__(self, concurrency_safe: bool = True) -> None:
+        self._concurrency_safe = concurrency_safe
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def concurrency_safe(self) -> bool:
+        return self._concurrency_safe
+
+    async def _apply(
+        self, payloads: Iterable[temporalio.api.common.v1.Payload], mark: bytes
+    ) -> List[temporalio.api.common.v1.Payload]:
+        payloads = list(payloads)
+        for p in payloads:
+            if p.data.startswith(b"fail"):
+                raise RuntimeError(f"Failed on {p.data.decode()}")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Give other calls a chance to start
+            await asyncio.sleep(0.01)
+            return [
+                temporalio.api.common.v1.Payload(metadata={"marked": mark}, data=p.data)
+                for p in payloads
+            ]
+        finally:
+            self.in_flight -= 1
+
+    async def encode(
+        self, payloads: Iterable[temporalio.api.common.v1.Payload]
+    ) -> List[temporalio.api.common.v1.Payload]:
+        return await self._apply(payloads, b"encode")
+
+    async def decode(
+        self, payloads: Iterable[temporalio.api.common.v1.Payload]
+    ) -> List[temporalio.api.common.v1.Payload]:
+        return await self._apply(payloads, b"decode")
+
+
+def _signal_job(
+    data: bytes,
+) -> temporalio.bridge.proto.workflow_activation.WorkflowActivationJob:
+    activation = temporalio.bridge.proto.workflow_activation
+    return activation.WorkflowActivationJob(
+        signal_workflow=activation.SignalWorkflow(
+            input=[temporalio.bridge.proto.common.Payload(data=data)]
+        )
+    )
+
+
+async def test_codec_concurrent():
+    codec = TrackingCodec()
+    act = temporalio.bridge.proto.workflow_activation.WorkflowActivation(
+        run_id="some run", jobs=[_signal_job(b"some data") for _ in range(3)]
+    )
+    await temporalio.bridge.worker.decode_activation(act, codec)
+    assert codec.max_in_flight == 3
+    assert _assert_all_marked(act, b"decode") == 3
+
+    codec = TrackingCodec()
+    commands = temporalio.bridge.proto.workflow_commands
+    comp = temporalio.bridge.proto.workflow_completion.WorkflowActivationCompletion(
+        run_id="some run"
+    )
+    comp.successful.commands.extend(
+        commands.WorkflowCommand(
+            schedule_activity=commands.ScheduleActivity(arguments=[_payload()])
+        )
+        for _ in range(3)
+    )
+    await temporalio.bridge.worker.encode_completion(comp, codec)
+    assert codec.max_in_flight == 3
+    assert _assert_all_marked(comp, b"encode") == 3
+
+
+async def test_codec_sequential_by_default():
+    codec = TrackingCodec(concurrency_safe=False)
+    act = temporalio.bridge.proto.workflow_activation.WorkflowActivation(
+        run_id="some run", jobs=[_signal_job(b"some data") for _ in range(3)]
+    )
+    await temporalio.bridge.worker.decode_activation(act, codec)
+    assert codec.max_in_flight == 1
+    assert _assert_all_marked(act, b"decode") == 3
+    assert not MarkingCodec().concurrency_safe
+
+
+async def test_codec_concurrent_failure():
+    codec = TrackingCodec()
+    act = temporalio.bridge.proto.workflow_activation.WorkflowActivation(
+        run_id="some run",
+        jobs=[
+            _signal_job(b"some data"),
+            _signal_job(b"fail 1"),
+            _signal_job(b"some data"),
+            _signal_job(b"fail 2"),
+        ],
+    )
+    # First failure in job order is raised
+    with pytest.raises(RuntimeError, match="Failed on fail 1"):
+        await temporalio.bridge.worker.decode_activation(act, codec)
+    # But only after the other jobs were fully decoded
+    assert codec.in_flight == 0
+    for i in [0, 2]:
+        payload = act.jobs[i].signal_workflow.input[0]
+        assert payload.metadata["marked"] == b"decode"
+
+
+# Returns copies of the payloads with nothing changed
+class PassThroughCodec(PayloadCodec):
+    async def encode(
+        self, payloads: Iterable[temporalio.api.common.v1.Payload]
+    ) -> List[temporalio.api.common.v1.Payload]:
+        return [
+            temporalio.api.common.v1.Payload(metadata=p.metadata, data=p.data)
+            for p in payloads
+        ]
+
+    async def decode(
+        self, payloads: Iterable[temporalio.api.common.v1.Payload]
+    ) -> List[temporalio.api.common.v1.Payload]:
+        return [
+            temporalio.api.common.v1.Payload(metadata=p.metadata, data=p.data)
+            for p in payloads
+        ]
+
+
+async def test_codec_unchanged_payloads():
+    def payload() -> temporalio.bridge.proto.common.Payload:
+        return temporalio.bridge.proto.common.Payload(
+            metadata={"encoding": b"json/plain"}, data=b'"some data"'
+        )
+
+    activation = temporalio.bridge.proto.workflow_activation
+    activity_result = temporalio.bridge.proto.activity_result
+    child_workflow = temporalio.bridge.proto.child_workflow
+    act = activation.WorkflowActivation(
+        run_id="some run",
+        jobs=[
+            activation.WorkflowActivationJob(
+                resolve_activity=activation.ResolveActivity(
+                    result=activity_result.ActivityResolution(
+                        completed=activity_result.Success(result=payload())
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                resolve_child_workflow_execution=activation.ResolveChildWorkflowExecution(
+                    result=child_workflow.ChildWorkflowResult(
+                        completed=child_workflow.Success(result=payload())
+                    )
+                )
+            ),
+            activation.WorkflowActivationJob(
+                start_workflow=activation.StartWorkflow(
+                    memo=temporalio.api.common.v1.Memo(
+                        fields={
+                            "foo": temporalio.api.common.v1.Payload(
+                                metadata={"encoding": b"json/plain"},
+                                data=b'"some data"',
+                            )
+                        }
+                    ),
+                )
+            ),
+        ],
+    )
+    expected_act = activation.WorkflowActivation()
+    expected_act.CopyFrom(act)
+    await temporalio.bridge.worker.decode_activation(act, PassThroughCodec())
+    assert act == expected_act
+
+    commands = temporalio.bridge.proto.workflow_commands
+    comp = temporalio.bridge.proto.workflow_completion.WorkflowActivationCompletion(
+        run_id="some run"
+    )
+    comp.successful.commands.extend(
+        [
+            commands.WorkflowCommand(
+                complete_workflow_execution=commands.CompleteWorkflowExecution(
+                    result=payload()
+                )
+            ),
+            commands.WorkflowCommand(
+                start_child_workflow_execution=commands.StartChildWorkflowExecution(
+                    memo={"foo": payload()}
+                )
+            ),
+        ]
+    )
+    expected_comp = (
+        temporalio.bridge.proto.workflow_completion.WorkflowActivationCompletion()
+    )
+    expected_comp.CopyFrom(comp)
+    await temporalio.bridge.worker.encode_completion(comp, PassThroughCodec())
+    assert comp == expected_comp